@@ -9,12 +9,20 @@ setup(
     packages=find_packages(),
     python_requires=">=3.10",
     install_requires=[
-        "httpx>=0.27.0",
+        "based58>=0.1.1",
+        "cryptography>=42.0",
+        "httpx[http2]>=0.27.0",
+        "msgspec>=0.18",
+        "numpy>=1.26",
+        "orjson>=3.9.0",
         "solders>=0.21.0",
         "solana>=0.34.0",
         "pynacl>=1.5.0",
     ],
     extras_require={
+        "fast": [
+            "numba>=0.59",
+        ],
         "dev": [
             "pytest>=8.0",
 # Updated: minor adjustment
@@ -0,0 +1,110 @@
+"""
+Opportunistic request coalescing for the your.fun Python SDK.
+Groups calls to the same API arriving within a short window into a single
+POST /api/batch round-trip, then fans the responses back out per caller.
+"""
+
+from __future__ import annotations
+import asyncio
+from typing import Any, Callable, Optional
+import httpx
+import orjson
+
+
+class AsyncBatcher:
+    """
+    Coalesces concurrent API calls into batched requests.
+
+    Calls submitted within `flush_interval` seconds (or until `max_batch`
+    is reached) are sent as one `POST /api/batch` with a `requests` array;
+    the server's `responses` array is split back onto per-call futures.
+    Streaming endpoints cannot be coalesced and must bypass the batcher.
+
+    Requires server support: the API must expose `POST /api/batch`.
+    Against a server without that route every coalesced call fails, so
+    only enable coalescing when the deployment provides it.
+    """
+
+    def __init__(
+        self,
+        http: httpx.AsyncClient,
+        headers_provider: Optional[Callable[[], dict[str, str]]] = None,
+        flush_interval: float = 0.005,
+        max_batch: int = 32,
+    ) -> None:
+        self._http = http
+        self._headers_provider = headers_provider
+        self._flush_interval = flush_interval
+        self._max_batch = max_batch
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._drain_task: Optional[asyncio.Task] = None
+
+    async def submit(self, endpoint: str, payload: Optional[dict]) -> Any:
+        """Queues one request and waits for its slice of the batch response."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((endpoint, payload, future))
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self._drain())
+        return await future
+
+    async def aclose(self) -> None:
+        """Stops the background drain task."""
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            self._drain_task = None
+
+    # -- Internal --
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._flush_interval
+            while len(batch) < self._max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), remaining)
+                    )
+                except asyncio.TimeoutError:
+                    break
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple]) -> None:
+        body = orjson.dumps({
+            "requests": [
+                {"endpoint": endpoint, "payload": payload}
+                for endpoint, payload, _ in batch
+            ],
+        })
+        headers = self._headers_provider() if self._headers_provider else None
+        try:
+            response = await self._http.post(
+                "/api/batch", content=body, headers=headers
+            )
+            response.raise_for_status()
+            results = orjson.loads(await response.aread())["responses"]
+        except Exception as exc:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        if len(results) != len(batch):
+            # A short (or long) responses array means the server did not
+            # answer one-to-one; failing every caller beats leaving the
+            # unmatched futures pending forever.
+            exc = RuntimeError(
+                f"/api/batch returned {len(results)} responses "
+                f"for {len(batch)} requests"
+            )
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,65 @@
+"""
+Shared HTTP client management for the your.fun Python SDK.
+Keeps one connection pool per (base_url, timeout) so SDK instances reuse
+warm TCP/TLS connections instead of paying a handshake per instance.
+"""
+
+from __future__ import annotations
+from typing import Any
+
+import httpx
+import msgspec
+import orjson
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serializes request bodies deterministically: no whitespace, keys
+    sorted. Identical payloads always produce identical bytes, so
+    server-side prefix caches that key on the raw body hit reliably.
+    """
+    return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+
+
+async def decode_response(response: httpx.Response, type_: Any = None) -> Any:
+    """
+    Reads the response body and decodes the JSON in one pass, directly
+    into `type_` when given (avoiding the intermediate dict that
+    response.json() builds).
+    """
+    body = await response.aread()
+    if type_ is None:
+        return msgspec.json.decode(body)
+    return msgspec.json.decode(body, type=type_)
+
+
+POOL_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=300.0,
+)
+
+_shared_clients: dict[tuple[str, float], httpx.AsyncClient] = {}
+
+
+def build_client(base_url: str, timeout: float = 30.0) -> httpx.AsyncClient:
+    """Constructs an AsyncClient with the SDK's tuned pool limits."""
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=timeout,
+        limits=POOL_LIMITS,
+        http2=True,
+    )
+
+
+def get_shared_client(base_url: str, timeout: float = 30.0) -> httpx.AsyncClient:
+    """
+    Returns the process-wide client for the given base URL, creating it
+    lazily. Callers must not close the returned client; it is shared.
+    """
+    key = (base_url, timeout)
+    client = _shared_clients.get(key)
+    if client is None or client.is_closed:
+        client = build_client(base_url, timeout)
+        _shared_clients[key] = client
+    return client
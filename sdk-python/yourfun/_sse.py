@@ -0,0 +1,29 @@
+"""
+Byte-level Server-Sent Events parsing for the your.fun Python SDK.
+Reads the response in large chunks and splits frames on raw bytes instead
+of decoding every line to str, keeping per-token overhead low.
+"""
+
+from __future__ import annotations
+from typing import AsyncGenerator
+import httpx
+
+_DATA_PREFIX = b"data: "
+
+
+async def aiter_sse_data(
+    response: httpx.Response, chunk_size: int = 65536
+) -> AsyncGenerator[bytes, None]:
+    """Yields the payload bytes of each `data:` frame in an SSE stream."""
+    buf = bytearray()
+    async for chunk in response.aiter_bytes(chunk_size):
+        buf += chunk
+        while (newline := buf.find(b"\n")) != -1:
+            line = bytes(buf[:newline])
+            del buf[:newline + 1]
+            if line.endswith(b"\r"):
+                line = line[:-1]
+            if line.startswith(_DATA_PREFIX):
+                yield line[6:]
+    if buf.startswith(_DATA_PREFIX):
+        yield bytes(buf[6:])
@@ -4,17 +4,25 @@ Provides async chat, streaming, and learning path interactions.
 """
 
 from __future__ import annotations
-import json
+import sys
 import time
+from collections import deque
 from typing import Optional, AsyncGenerator
 import httpx
+import orjson
 
+import msgspec
+
+from yourfun._batcher import AsyncBatcher
+from yourfun._http import build_client, decode_response, dumps
+from yourfun._sse import aiter_sse_data
 from yourfun.types import (
     ChatMessage,
     ChatResponse,
-    InteractionType,
     PersonalityType,
     LearningProgress,
+    ProgressEnvelope,
+    SessionEnvelope,
 )
 
 
@@ -46,13 +54,45 @@ PERSONALITY_PROMPTS: dict[PersonalityType, str] = {
     ),
 }
 
+# Index-based lookup table for the hot paths; PERSONALITY_PROMPTS stays
+# public for external consumers. Interning lets downstream equality checks
+# short-circuit on identity.
+_PERSONALITY_PROMPT_TABLE: tuple[str, ...] = tuple(
+    sys.intern(PERSONALITY_PROMPTS[PersonalityType(i)])
+    for i in range(len(PersonalityType))
+)
+
+
+def _now_ms() -> int:
+    """Current wall-clock time in integer milliseconds."""
+    return time.time_ns() // 1_000_000
+
+
+def _message_to_dict(message: ChatMessage) -> dict:
+    """Converts a ChatMessage to its wire-format dict."""
+    return {
+        "role": message.role,
+        "content": message.content,
+        "timestamp": message.timestamp,
+    }
+
 
 class AICompanion:
     """
-    Standalone AI companion interface for direct use.
+    AI companion interface bound to an externally-managed HTTP client.
+
+    Requiring the client keeps socket and TLS state O(pool) when a server
+    hosts one companion per user; scripts that just want a working
+    companion should use `create_standalone`.
+
+    `enable_coalescing=True` routes chat turns through an AsyncBatcher
+    and requires a server that exposes `POST /api/batch`; leave it off
+    otherwise.
 
     Usage:
-        companion = AICompanion(api_url, auth_token)
+        client = httpx.AsyncClient(base_url=api_url)
+        companion = AICompanion(client, auth_token)
+        # or: companion = AICompanion.create_standalone(api_url, auth_token)
         session_id = await companion.start_session("Solana Basics")
         response = await companion.chat("What is a PDA?")
         print(response.reply)
@@ -60,43 +100,98 @@ class AICompanion:
 
     def __init__(
         self,
-        api_base_url: str,
+        client: httpx.AsyncClient,
         auth_token: str,
         personality: PersonalityType = PersonalityType.MENTOR,
         max_context_length: int = 20,
+        enable_coalescing: bool = False,
     ) -> None:
-        self._api_base_url = api_base_url.rstrip("/")
         self._auth_token = auth_token
         self._personality = personality
         self._max_context_length = max_context_length
         self._session_id: Optional[str] = None
-        self._history: list[ChatMessage] = []
-        self._http = httpx.AsyncClient(
-            base_url=self._api_base_url,
-            timeout=30.0,
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {auth_token}",
-            },
+        # Conversation state is kept in three position-stable segments so the
+        # context sent to /api/chat is always [system] + [committed prefix] +
+        # [pending turn]. The committed prefix is append-only: messages never
+        # shift position between turns, which keeps provider-side prompt
+        # caches warm across a session.
+        # The committed segment is a deque so trimming the oldest turns is
+        # O(1); memory stays bounded by max_context_length however long
+        # the session runs.
+        self._system: list[ChatMessage] = []
+        self._committed: deque[ChatMessage] = deque()
+        self._pending: list[ChatMessage] = []
+        # Wire-format mirrors of the stable segments: index 0 is the system
+        # prompt, the rest is the committed prefix. Maintained incrementally
+        # so no chat turn has to rescan or re-serialize history. The dict
+        # mirror feeds the batcher; the bytes mirror feeds direct POSTs.
+        self._context_dicts: list[dict] = []
+        self._context_json: list[bytes] = []
+        # Serialized invariant head of the chat body ('{"sessionId":...,
+        # "personalityId":...'), rebuilt on session start or personality
+        # change.
+        self._chat_prefix: Optional[bytes] = None
+        # Auth travels per-request so a shared client can serve multiple
+        # companions with different tokens.
+        self._headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {auth_token}",
+        }
+        self._owns_client = False
+        self._http = client
+        self._batcher: Optional[AsyncBatcher] = None
+        if enable_coalescing:
+            self._batcher = AsyncBatcher(
+                self._http, headers_provider=lambda: self._headers
+            )
+
+    @classmethod
+    def create_standalone(
+        cls,
+        api_base_url: str,
+        auth_token: str,
+        personality: PersonalityType = PersonalityType.MENTOR,
+        max_context_length: int = 20,
+        enable_coalescing: bool = False,
+    ) -> AICompanion:
+        """
+        Builds a companion that owns a tuned client of its own; `close()`
+        will close it. Convenience for scripts and one-off usage.
+        """
+        companion = cls(
+            build_client(api_base_url.rstrip("/")),
+            auth_token,
+            personality=personality,
+            max_context_length=max_context_length,
+            enable_coalescing=enable_coalescing,
         )
+        companion._owns_client = True
+        return companion
 
     async def start_session(self, topic_name: str) -> str:
         """Starts a new conversation session."""
-        response = await self._http.post("/api/chat/session", json={
+        response = await self._http.post("/api/chat/session", content=dumps({
             "personalityId": int(self._personality),
             "topicName": topic_name,
-        })
+        }), headers=self._headers)
         response.raise_for_status()
-        data = response.json()
-        self._session_id = data["sessionId"]
+        envelope = await decode_response(response, SessionEnvelope)
+        self._session_id = envelope.session_id
 
-        self._history.clear()
+        self._committed.clear()
+        self._pending.clear()
         system_prompt = self._build_system_prompt(topic_name)
-        self._history.append(ChatMessage(
+        self._system = [ChatMessage(
             role="system",
             content=system_prompt,
-            timestamp=int(time.time() * 1000),
-        ))
+            timestamp=_now_ms(),
+        )]
+        self._context_dicts = [_message_to_dict(self._system[0])]
+        self._context_json = [dumps(self._context_dicts[0])]
+        self._chat_prefix = dumps({
+            "sessionId": self._session_id,
+            "personalityId": int(self._personality),
+        })[:-1]
 
         return self._session_id
 
@@ -105,85 +200,92 @@ class AICompanion:
         if not self._session_id:
             raise RuntimeError("No active session. Call start_session() first.")
 
-        user_msg = ChatMessage(
+        self._pending.append(ChatMessage(
             role="user",
             content=message,
-            timestamp=int(time.time() * 1000),
-        )
-        self._history.append(user_msg)
+            timestamp=_now_ms(),
+        ))
 
-        context_window = self._get_context_window()
-        response = await self._http.post("/api/chat", json={
-            "sessionId": self._session_id,
-            "message": message,
-            "personalityId": int(self._personality),
-            "context": [
-                {"role": m.role, "content": m.content, "timestamp": m.timestamp}
-                for m in context_window
-            ],
-        })
-        response.raise_for_status()
-        data = response.json()
+        self._context_dicts.extend(_message_to_dict(m) for m in self._pending)
+        self._context_json.extend(dumps(_message_to_dict(m)) for m in self._pending)
+        try:
+            if self._batcher is not None:
+                data = await self._batcher.submit("/api/chat", {
+                    "sessionId": self._session_id,
+                    "message": message,
+                    "personalityId": int(self._personality),
+                    "context": self._context_dicts,
+                })
+                chat_response = msgspec.convert(data, type=ChatResponse)
+            else:
+                # Only the message and the pending context entries are new
+                # bytes; the prefix and committed context reuse cached
+                # serializations.
+                body = b"".join((
+                    self._chat_prefix,
+                    b',"message":', orjson.dumps(message),
+                    b',"context":[', b",".join(self._context_json), b"]}",
+                ))
+                response = await self._http.post(
+                    "/api/chat", content=body, headers=self._headers
+                )
+                response.raise_for_status()
+                chat_response = await decode_response(response, ChatResponse)
+        finally:
+            self._commit_pending(mirrored=True)
 
-        assistant_msg = ChatMessage(
+        self._commit_message(ChatMessage(
             role="assistant",
-            content=data["reply"],
-            timestamp=int(time.time() * 1000),
-        )
-        self._history.append(assistant_msg)
-
-        return ChatResponse(
-            reply=data["reply"],
-            content_hash=data["contentHash"],
-            interaction_type=InteractionType(data["interactionType"]),
-            suggested_score=data["suggestedScore"],
-            learning_insights=data.get("learningInsights", []),
-            next_topic_suggestions=data.get("nextTopicSuggestions", []),
-        )
+            content=chat_response.reply,
+            timestamp=_now_ms(),
+        ))
+
+        return chat_response
 
     async def chat_stream(self, message: str) -> AsyncGenerator[str, None]:
         """Sends a message and yields response tokens via SSE."""
         if not self._session_id:
             raise RuntimeError("No active session. Call start_session() first.")
 
-        user_msg = ChatMessage(
+        self._pending.append(ChatMessage(
             role="user",
             content=message,
-            timestamp=int(time.time() * 1000),
-        )
-        self._history.append(user_msg)
+            timestamp=_now_ms(),
+        ))
 
-        async with self._http.stream(
-            "POST",
-            "/api/chat/stream",
-            json={
-                "sessionId": self._session_id,
-                "message": message,
-                "personalityId": int(self._personality),
-            },
-            headers={"Accept": "text/event-stream"},
-        ) as response:
-            response.raise_for_status()
-            full_reply = ""
-            async for line in response.aiter_lines():
-                if line.startswith("data: "):
-                    payload = line[6:]
-                    if payload == "[DONE]":
+        try:
+            async with self._http.stream(
+                "POST",
+                "/api/chat/stream",
+                content=(
+                    self._chat_prefix
+                    + b',"message":' + orjson.dumps(message)
+                    + b"}"
+                ),
+                headers={**self._headers, "Accept": "text/event-stream"},
+            ) as response:
+                response.raise_for_status()
+                parts: list[str] = []
+                async for payload in aiter_sse_data(response):
+                    if payload == b"[DONE]":
                         break
                     try:
-                        parsed = json.loads(payload)
+                        parsed = orjson.loads(payload)
                         if parsed.get("type") == "token" and parsed.get("content"):
-                            full_reply += parsed["content"]
+                            parts.append(parsed["content"])
                             yield parsed["content"]
-                    except json.JSONDecodeError:
-                        full_reply += payload
-                        yield payload
+                    except orjson.JSONDecodeError:
+                        text = payload.decode("utf-8")
+                        parts.append(text)
+                        yield text
+        finally:
+            self._commit_pending()
 
-            self._history.append(ChatMessage(
-                role="assistant",
-                content=full_reply,
-                timestamp=int(time.time() * 1000),
-            ))
+        self._commit_message(ChatMessage(
+            role="assistant",
+            content="".join(parts),
+            timestamp=_now_ms(),
+        ))
 
     async def generate_quiz(
         self, topic_id: str, difficulty: int = 5
@@ -198,64 +300,82 @@ class AICompanion:
 
     async def get_learning_progress(self) -> list[LearningProgress]:
         """Retrieves learning progress from the API."""
-        response = await self._http.get("/api/learn/progress")
+        response = await self._http.get("/api/learn/progress", headers=self._headers)
         response.raise_for_status()
-        data = response.json()["progress"]
-        return [
-
-            LearningProgress(
-                topic_id=p["topicId"],
-                topic_name=p["topicName"],
-                completed_lessons=p["completedLessons"],
-                total_lessons=p["totalLessons"],
-                current_score=p["currentScore"],
-                streak=p["streak"],
-                last_activity_at=p["lastActivityAt"],
-                progress_percent=p.get("progressPercent", 0),
-            )
-            for p in data
-        ]
+        return (await decode_response(response, ProgressEnvelope)).progress
 
     @property
     def conversation_history(self) -> list[ChatMessage]:
-        return list(self._history)
+        return self._system + list(self._committed) + self._pending
 
     def clear_history(self) -> None:
         """Clears conversation history, keeping only the system prompt."""
-        system_msgs = [m for m in self._history if m.role == "system"]
-        self._history = system_msgs
+        self._committed.clear()
+        self._pending.clear()
+        del self._context_dicts[1:]
+        del self._context_json[1:]
 
     def set_personality(self, personality: PersonalityType) -> None:
         """Changes the companion personality mid-session."""
         self._personality = personality
-        for i, msg in enumerate(self._history):
-            if msg.role == "system":
-                self._history[i] = ChatMessage(
-                    role="system",
-                    content=PERSONALITY_PROMPTS.get(personality, ""),
-                    timestamp=msg.timestamp,
-                )
-                break
+        if self._system:
+            self._system[0] = ChatMessage(
+                role="system",
+                content=_PERSONALITY_PROMPT_TABLE[int(personality)],
+                timestamp=self._system[0].timestamp,
+            )
+            self._context_dicts[0] = _message_to_dict(self._system[0])
+            self._context_json[0] = dumps(self._context_dicts[0])
+        if self._session_id:
+            self._chat_prefix = dumps({
+                "sessionId": self._session_id,
+                "personalityId": int(personality),
+            })[:-1]
 
     async def close(self) -> None:
-        """Closes the HTTP client."""
-        await self._http.aclose()
+        """Closes the batcher, and the HTTP client if this companion owns it."""
+        if self._batcher is not None:
+            await self._batcher.aclose()
+        if self._owns_client:
+            await self._http.aclose()
 
     # -- Private helpers --
 
-    def _get_context_window(self) -> list[ChatMessage]:
-        if len(self._history) <= self._max_context_length:
-            return list(self._history)
+    def _commit_message(self, message: ChatMessage) -> None:
+        """Appends a message to the stable committed prefix."""
+        self._committed.append(message)
+        self._context_dicts.append(_message_to_dict(message))
+        self._context_json.append(dumps(self._context_dicts[-1]))
+        self._trim_committed()
 
-        system_msgs = [m for m in self._history if m.role == "system"]
-        recent = [m for m in self._history if m.role != "system"]
-        cut = self._max_context_length - len(system_msgs)
-        return system_msgs + recent[-cut:]
+    def _commit_pending(self, mirrored: bool = False) -> None:
+        """Moves the current turn into the committed prefix."""
+        if not mirrored:
+            self._context_dicts.extend(
+                _message_to_dict(m) for m in self._pending
+            )
+            self._context_json.extend(
+                dumps(_message_to_dict(m)) for m in self._pending
+            )
+        self._committed.extend(self._pending)
+        self._pending.clear()
+        self._trim_committed()
+
+    def _trim_committed(self) -> None:
+        """
+        Evicts the oldest committed turns past max_context_length. An
+        eviction shifts the prefix (one provider-cache miss), but keeps
+        memory and per-turn payload size bounded.
+        """
+        overflow = len(self._committed) - self._max_context_length
+        if overflow > 0:
+            for _ in range(overflow):
+                self._committed.popleft()
+            del self._context_dicts[1:1 + overflow]
+            del self._context_json[1:1 + overflow]
 
     def _build_system_prompt(self, topic_name: str) -> str:
-        personality_prompt = PERSONALITY_PROMPTS.get(
-            self._personality, PERSONALITY_PROMPTS[PersonalityType.MENTOR]
-        )
+        personality_prompt = _PERSONALITY_PROMPT_TABLE[int(self._personality)]
         return (
             f"{personality_prompt}\n\n"
             f"The current learning topic is: {topic_name}. "
@@ -4,21 +4,29 @@ Provides a unified interface for verification, AI chat, and learning operations.
 """
 
 from __future__ import annotations
+import asyncio
 import time
-import json
 from typing import Optional, AsyncGenerator
 import httpx
+import orjson
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
 from nacl.signing import SigningKey
-from nacl.encoding import RawEncoder
-import base58
+import based58 as base58
 
+import msgspec
+
+from yourfun._batcher import AsyncBatcher
+from yourfun._http import decode_response, dumps, get_shared_client
+from yourfun._sse import aiter_sse_data
 from yourfun.types import (
     ChatMessage,
     ChatResponse,
     ChallengeResponse,
     LearningProgress,
+    ProgressEnvelope,
+    SessionEnvelope,
+    TopicsEnvelope,
     VerificationStatus,
-    InteractionType,
     PersonalityType,
 )
 
@@ -27,6 +35,10 @@ class YourFunClient:
     """
     Async context manager client for the your.fun platform.
 
+    `enable_coalescing=True` routes eligible calls through an
+    AsyncBatcher and requires a server that exposes `POST /api/batch`;
+    leave it off otherwise.
+
     Usage:
         async with YourFunClient(keypair, api_url) as client:
             status = await client.get_verification_status()
@@ -39,29 +51,54 @@ class YourFunClient:
         signing_key: SigningKey,
         api_base_url: str = "http://localhost:3100",
         timeout: float = 30.0,
+        client: Optional[httpx.AsyncClient] = None,
+        enable_coalescing: bool = False,
     ):
         self._signing_key = signing_key
         self._verify_key = signing_key.verify_key
+        # Hot-path signing goes through OpenSSL's Ed25519, which skips the
+        # SignedMessage wrapper allocation and is faster than libsodium's
+        # reference implementation on x86_64. The pynacl key stays the
+        # public construction API.
+        self._ossl_key = Ed25519PrivateKey.from_private_bytes(
+            bytes(signing_key)
+        )
         self._wallet = base58.b58encode(
             bytes(self._verify_key)
         ).decode("ascii")
         self._api_base_url = api_base_url.rstrip("/")
         self._timeout = timeout
+        # Static pieces of the auth token, assembled once: the signed
+        # message prefix and the "<wallet>." token head.
+        self._auth_prefix = b"your.fun-auth:"
+        self._token_prefix = self._wallet.encode("ascii") + b"."
+        # Injected clients and the shared pool are managed by their owners;
+        # this instance never closes them.
+        self._external_client = client
         self._http: Optional[httpx.AsyncClient] = None
         self._session_id: Optional[str] = None
+        # The signed auth message only changes when int(time.time()) ticks,
+        # so the token is cached per second to skip redundant signatures.
+        self._auth_ts: int = 0
+        self._auth_headers: dict[str, str] = {}
+        self._enable_coalescing = enable_coalescing
+        self._batcher: Optional[AsyncBatcher] = None
 
     async def __aenter__(self) -> YourFunClient:
-        self._http = httpx.AsyncClient(
-            base_url=self._api_base_url,
-            timeout=self._timeout,
-            headers=self._build_auth_headers(),
+        self._http = self._external_client or get_shared_client(
+            self._api_base_url, self._timeout
         )
+        if self._enable_coalescing:
+            self._batcher = AsyncBatcher(
+                self._http, headers_provider=self._batch_headers
+            )
         return self
 
     async def __aexit__(self, *args) -> None:
-        if self._http:
-            await self._http.aclose()
-            self._http = None
+        if self._batcher is not None:
+            await self._batcher.aclose()
+            self._batcher = None
+        self._http = None
 
     @property
     def wallet(self) -> str:
@@ -81,13 +118,7 @@ class YourFunClient:
             "wallet": self._wallet,
             "challengeType": challenge_type,
         })
-        data = response.json()
-        return ChallengeResponse(
-            challenge_id=data["challengeId"],
-            challenge_data=data["challengeData"],
-            expires_at=data["expiresAt"],
-            difficulty=data["difficulty"],
-        )
+        return await decode_response(response, ChallengeResponse)
 
     async def submit_verification(
         self,
@@ -102,21 +133,27 @@ class YourFunClient:
             "fingerprintData": fingerprint_data,
             "wallet": self._wallet,
         })
-        return response.json()
+        return await decode_response(response)
 
     async def get_verification_status(self) -> VerificationStatus:
         """Checks the on-chain verification status of the connected wallet."""
         response = await self._get(f"/api/verify/status/{self._wallet}")
-        data = response.json()
-        return VerificationStatus(
-            is_registered=data["isRegistered"],
-            is_verified=data["isVerified"],
-            verification_level=data["verificationLevel"],
-            verified_at=data.get("verifiedAt"),
-            session_count=data["sessionCount"],
-            total_interactions=data["totalInteractions"],
-            learning_score=data["learningScore"],
+        return await decode_response(response, VerificationStatus)
+
+    async def prefetch(
+        self,
+    ) -> tuple[VerificationStatus, list[dict], list[LearningProgress]]:
+        """
+        Fetches verification status, topics, and progress concurrently.
+        Typical startup issues these serially and pays three round trips;
+        issuing them together costs only the slowest one.
+        """
+        status, topics, progress = await asyncio.gather(
+            self.get_verification_status(),
+            self.get_topics(),
+            self.get_progress(),
         )
+        return status, topics, progress
 
     # -- AI Companion --
 
@@ -130,8 +167,8 @@ class YourFunClient:
             "personalityId": int(personality),
             "topicName": topic_name,
         })
-        data = response.json()
-        self._session_id = data["sessionId"]
+        envelope = await decode_response(response, SessionEnvelope)
+        self._session_id = envelope.session_id
         return self._session_id
 
     async def chat(
@@ -155,16 +192,7 @@ class YourFunClient:
             ]
 
         response = await self._post("/api/chat", payload)
-        data = response.json()
-
-        return ChatResponse(
-            reply=data["reply"],
-            content_hash=data["contentHash"],
-            interaction_type=InteractionType(data["interactionType"]),
-            suggested_score=data["suggestedScore"],
-            learning_insights=data.get("learningInsights", []),
-            next_topic_suggestions=data.get("nextTopicSuggestions", []),
-        )
+        return await decode_response(response, ChatResponse)
 
     async def chat_stream(
         self, message: str
@@ -176,24 +204,25 @@ class YourFunClient:
         async with self._http.stream(
             "POST",
             "/api/chat/stream",
-            json={
+            content=dumps({
                 "sessionId": self._session_id,
                 "message": message,
+            }),
+            headers={
+                **self._current_auth_headers(),
+                "Accept": "text/event-stream",
             },
-            headers={"Accept": "text/event-stream"},
         ) as response:
             response.raise_for_status()
-            async for line in response.aiter_lines():
-                if line.startswith("data: "):
-                    payload = line[6:]
-                    if payload == "[DONE]":
-                        break
-                    try:
-                        parsed = json.loads(payload)
-                        if parsed.get("type") == "token" and parsed.get("content"):
-                            yield parsed["content"]
-                    except json.JSONDecodeError:
-                        yield payload
+            async for payload in aiter_sse_data(response):
+                if payload == b"[DONE]":
+                    break
+                try:
+                    parsed = orjson.loads(payload)
+                    if parsed.get("type") == "token" and parsed.get("content"):
+                        yield parsed["content"]
+                except orjson.JSONDecodeError:
+                    yield payload.decode("utf-8")
 
     async def close_session(self) -> dict:
         """Closes the current AI companion session."""
@@ -204,37 +233,31 @@ class YourFunClient:
             f"/api/chat/session/{self._session_id}"
         )
         self._session_id = None
-        return response.json()
+        return await decode_response(response)
 
     # -- Learning --
 
     async def get_topics(self) -> list[dict]:
         """Returns all available learning topics."""
         response = await self._get("/api/learn/topics")
-        return response.json()["topics"]
+        return (await decode_response(response, TopicsEnvelope)).topics
 
     async def get_topic(self, topic_id: str) -> dict:
         """Returns detailed information about a specific topic."""
+        if self._batcher is not None:
+            return await self._batcher.submit(
+                f"/api/learn/topics/{topic_id}", None
+            )
         response = await self._get(f"/api/learn/topics/{topic_id}")
-        return response.json()
+        return await decode_response(response)
 
     async def get_progress(self) -> list[LearningProgress]:
         """Returns learning progress across all topics."""
+        if self._batcher is not None:
+            data = await self._batcher.submit("/api/learn/progress", None)
+            return msgspec.convert(data, type=ProgressEnvelope).progress
         response = await self._get("/api/learn/progress")
-        data = response.json()["progress"]
-        return [
-            LearningProgress(
-                topic_id=p["topicId"],
-                topic_name=p["topicName"],
-                completed_lessons=p["completedLessons"],
-                total_lessons=p["totalLessons"],
-                current_score=p["currentScore"],
-                streak=p["streak"],
-                last_activity_at=p["lastActivityAt"],
-                progress_percent=p.get("progressPercent", 0),
-            )
-            for p in data
-        ]
+        return (await decode_response(response, ProgressEnvelope)).progress
 
     async def complete_lesson(
         self, topic_id: str, lesson_id: str, score: int
@@ -245,65 +268,76 @@ class YourFunClient:
             "lessonId": lesson_id,
             "score": score,
         })
-        return response.json()
+        return await decode_response(response)
 
     async def submit_quiz_answer(
         self, question_id: str, answer: str
     ) -> ChatResponse:
         """Submits a quiz answer and gets AI-powered feedback."""
-        response = await self._post("/api/learn/quiz/submit", {
+        payload = {
             "sessionId": self._session_id,
             "questionId": question_id,
             "answer": answer,
-        })
-        data = response.json()
-        return ChatResponse(
-            reply=data["reply"],
-            content_hash=data["contentHash"],
-            interaction_type=InteractionType(data["interactionType"]),
-            suggested_score=data["suggestedScore"],
-            learning_insights=data.get("learningInsights", []),
-            next_topic_suggestions=data.get("nextTopicSuggestions", []),
-        )
+        }
+        if self._batcher is not None:
+            data = await self._batcher.submit("/api/learn/quiz/submit", payload)
+            return msgspec.convert(data, type=ChatResponse)
+        response = await self._post("/api/learn/quiz/submit", payload)
+        return await decode_response(response, ChatResponse)
 
     # -- Internal HTTP helpers --
 
     def _build_auth_headers(self) -> dict[str, str]:
-        timestamp = str(int(time.time()))
-        message = f"your.fun-auth:{timestamp}"
-        message_bytes = message.encode("utf-8")
+        timestamp = str(int(time.time())).encode("ascii")
+        message = self._auth_prefix + timestamp
 
-        signed = self._signing_key.sign(message_bytes, encoder=RawEncoder)
-        signature = signed.signature
+        signature = self._ossl_key.sign(message)
 
-        wallet_b58 = self._wallet
-        sig_b58 = base58.b58encode(signature).decode("ascii")
-        token = f"{wallet_b58}.{sig_b58}.{timestamp}"
+        token = (
+            self._token_prefix
+            + base58.b58encode(signature)
+            + b"."
+            + timestamp
+        )
 
         return {
-            "Authorization": f"Bearer {token}",
+            "Authorization": "Bearer " + token.decode("ascii"),
             "Content-Type": "application/json",
         }
 
     async def _get(self, path: str) -> httpx.Response:
-        self._refresh_auth()
-        response = await self._http.get(path)
+        response = await self._http.get(
+            path, headers=self._current_auth_headers()
+        )
         response.raise_for_status()
         return response
 
     async def _post(self, path: str, data: dict) -> httpx.Response:
-        self._refresh_auth()
-        response = await self._http.post(path, json=data)
+        response = await self._http.post(
+            path, content=dumps(data), headers=self._current_auth_headers()
+        )
         response.raise_for_status()
         return response
 
     async def _delete(self, path: str) -> httpx.Response:
-        self._refresh_auth()
-        response = await self._http.delete(path)
+        response = await self._http.delete(
+            path, headers=self._current_auth_headers()
+        )
         response.raise_for_status()
         return response
 
-    def _refresh_auth(self) -> None:
-        """Refreshes the authentication token if needed."""
-        if self._http:
-            self._http.headers.update(self._build_auth_headers())
+    def _batch_headers(self) -> dict[str, str]:
+        return self._current_auth_headers()
+
+    def _current_auth_headers(self) -> dict[str, str]:
+        """
+        Returns auth headers for the current second, re-signing only when
+        the second ticks. Auth travels per-request rather than on the
+        client, so many YourFunClient instances can share one
+        AsyncClient without racing on its header state.
+        """
+        now = int(time.time())
+        if now != self._auth_ts:
+            self._auth_headers = self._build_auth_headers()
+            self._auth_ts = now
+        return self._auth_headers
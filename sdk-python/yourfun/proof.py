@@ -9,10 +9,61 @@ import hashlib
 import os
 import math
 import time
+from array import array
 from dataclasses import dataclass, field
-from typing import Optional
 import struct
 
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    # JIT-compiled challenge mixing (install with the "fast" extra). The
+    # loops compile to native uint8 arithmetic; the pure-Python version in
+    # solve_challenge remains the fallback and the reference.
+    @njit(cache=True)
+    def _mix_challenge(
+        nonce: np.ndarray, fp: np.ndarray, out: np.ndarray
+    ) -> None:
+        for i in range(32):
+            v = nonce[i] ^ fp[i]
+            v = (v + nonce[(i + 7) % 32]) & 0xFF
+            out[i] = v ^ fp[(i + 13) % 32]
+        for round_num in range(4):
+            for i in range(32):
+                prev = out[(i + 31) % 32]
+                nxt = out[(i + 1) % 32]
+                out[i] = (out[i] + ((prev * nxt) & 0xFF) + round_num) & 0xFF
+else:
+    _mix_challenge = None
+
+# SWAR masks over all 32 bytes at once: 0x7f keeps byte-wise adds from
+# carrying into the neighbouring byte; 0x80 restores the top bit of
+# each byte afterwards. CPython big ints make the whole first pass a
+# handful of 256-bit C-level operations.
+_LANE_LO = int.from_bytes(b"\x7f" * 32, "little")
+_LANE_HI = int.from_bytes(b"\x80" * 32, "little")
+
+# Precompiled fingerprint layout; parsing the format string once at
+# import keeps it off the per-pack cost.
+_METRICS_STRUCT = struct.Struct(">dddddId")
+
+# Bound once so the hot mouse path skips the module attribute lookup.
+_sqrt = math.sqrt
+
+
+def _sha256(data: bytes):
+    """
+    SHA-256 via CPython's OpenSSL binding, which dispatches to SHA-NI
+    hardware rounds where the CPU supports them. Fingerprints are public
+    commitments rather than secrets, so usedforsecurity=False skips the
+    FIPS-provider gate on builds that enforce it.
+    """
+    return hashlib.sha256(data, usedforsecurity=False)
+
 
 @dataclass
 class BehavioralEvent:
@@ -60,93 +111,108 @@ class ProofGenerator:
     MIN_EVENTS_REQUIRED = 50
     MIN_SESSION_DURATION_MS = 5000.0
 
+    # Ring-neighbour indices for the challenge round loop, computed once
+    # instead of two modulo ops per byte per round. The SWAR first pass
+    # covers its own (i+7)/(i+13) rotations via the rotated buffers.
+    _IDX1 = tuple((i + 1) % 32 for i in range(32))
+    _IDX31 = tuple((i + 31) % 32 for i in range(32))
+
     def __init__(self) -> None:
-        self._events: list[BehavioralEvent] = []
-        self._session_start: float = time.time() * 1000
+        # Monotonic clock: immune to wall-clock jumps, and the integer
+        # ns read is cheaper than time.time()'s float conversion.
+        self._session_start_ns: int = time.monotonic_ns()
+        # Each metric reads its own contiguous float buffer, filled at
+        # record time (struct-of-arrays). compute_metrics never rescans
+        # an event log, and the buffers feed NumPy without conversion.
+        self._key_holds = array("d")
+        self._key_intervals = array("d")
+        self._mouse_velocities = array("d")
+        self._scroll_deltas = array("d")
+        self._idle_durations = array("d")
+        self._scroll_count = 0
+        self._focus_count = 0
+        self._event_count = 0
+        # Timestamp of the most recently recorded event, any type.
+        self._last_event_ts = 0.0
+        # Last mouse sample, cached so velocity derives in O(1) instead
+        # of scanning backwards for the previous mouse event.
+        self._last_mouse_x = math.nan
+        self._last_mouse_y = math.nan
+        self._last_mouse_t = math.nan
 
     def record_keystroke(self, key_down_time: float, key_up_time: float) -> None:
         """Records a keystroke timing event with hold duration and interval."""
-        hold_duration = key_up_time - key_down_time
         interval = 0.0
-        if self._events:
-            interval = key_down_time - self._events[-1].timestamp
-
-        self._events.append(BehavioralEvent(
-            event_type="keystroke",
-            timestamp=key_down_time,
-            data={
-                "hold_duration": hold_duration,
-                "interval": interval,
-                "key_up_time": key_up_time,
-            },
-        ))
+        if self._event_count:
+            interval = key_down_time - self._last_event_ts
+
+        self._key_holds.append(key_up_time - key_down_time)
+        # Only positive intervals feed the variance metric; filtering
+        # here keeps the buffer free of unusable rows.
+        if interval > 0:
+            self._key_intervals.append(interval)
+        self._event_count += 1
+        self._last_event_ts = key_down_time
 
     def record_mouse_movement(self, x: float, y: float, timestamp: float) -> None:
-        """Records a mouse movement with computed velocity and acceleration."""
+        """Records a mouse movement with its computed velocity."""
         velocity = 0.0
-        acceleration = 0.0
 
-        last_mouse = self._get_last_event_of_type("mouse")
-        if last_mouse:
-            dt = timestamp - last_mouse.timestamp
+        if not math.isnan(self._last_mouse_t):
+            dt = timestamp - self._last_mouse_t
             if dt > 0:
-                dx = x - last_mouse.data.get("x", 0)
-                dy = y - last_mouse.data.get("y", 0)
-                velocity = math.sqrt(dx * dx + dy * dy) / dt
-                prev_velocity = last_mouse.data.get("velocity", 0)
-                if prev_velocity > 0:
-                    acceleration = (velocity - prev_velocity) / dt
-
-        self._events.append(BehavioralEvent(
-            event_type="mouse",
-            timestamp=timestamp,
-            data={"x": x, "y": y, "velocity": velocity, "acceleration": acceleration},
-        ))
+                dx = x - self._last_mouse_x
+                dy = y - self._last_mouse_y
+                velocity = _sqrt(dx * dx + dy * dy) / dt
+
+        self._last_mouse_x = x
+        self._last_mouse_y = y
+        self._last_mouse_t = timestamp
+
+        self._mouse_velocities.append(velocity)
+        self._event_count += 1
+        self._last_event_ts = timestamp
 
     def record_scroll(self, delta_y: float, timestamp: float) -> None:
         """Records a scroll event with direction and intensity."""
-        self._events.append(BehavioralEvent(
-            event_type="scroll",
-            timestamp=timestamp,
-            data={"delta_y": delta_y, "intensity": abs(delta_y)},
-        ))
+        # Zero deltas are noise: they carry no direction or intensity,
+        # and previously registered as spurious downward direction
+        # changes. They still count toward the event totals.
+        if delta_y != 0:
+            self._scroll_deltas.append(delta_y)
+        self._scroll_count += 1
+        self._event_count += 1
+        self._last_event_ts = timestamp
 
     def record_focus_change(self, has_focus: bool, timestamp: float) -> None:
         """Records a window focus change event."""
-        self._events.append(BehavioralEvent(
-            event_type="focus",
-            timestamp=timestamp,
-            data={"has_focus": 1.0 if has_focus else 0.0},
-        ))
+        self._focus_count += 1
+        self._event_count += 1
+        self._last_event_ts = timestamp
 
     def record_idle_period(self, start_time: float, end_time: float) -> None:
         """Records a detected idle period."""
-        self._events.append(BehavioralEvent(
-            event_type="idle",
-            timestamp=start_time,
-            data={"duration": end_time - start_time},
-        ))
+        self._idle_durations.append(end_time - start_time)
+        self._event_count += 1
+        self._last_event_ts = start_time
 
     def compute_metrics(self) -> BehavioralMetrics:
         """Computes aggregated behavioral metrics from all recorded events."""
-        session_duration_ms = time.time() * 1000 - self._session_start
+        session_duration_ms = self._elapsed_ms()
 
-        keystrokes = [e for e in self._events if e.event_type == "keystroke"]
-        intervals = [e.data["interval"] for e in keystrokes if e.data["interval"] > 0]
-        keystroke_variance = self._compute_variance(intervals)
+        keystroke_variance = self._compute_variance(
+            np.frombuffer(self._key_intervals, dtype=np.float64)
+        )
 
-        mouse_events = [e for e in self._events if e.event_type == "mouse"]
-        velocities = [e.data["velocity"] for e in mouse_events]
-        mouse_entropy = self._compute_entropy(velocities)
+        mouse_entropy = self._compute_entropy(self._mouse_velocities)
 
-        scroll_events = [e for e in self._events if e.event_type == "scroll"]
-        scroll_score = self._compute_scroll_pattern(scroll_events)
+        scroll_score = self._compute_scroll_pattern(self._scroll_deltas)
 
-        focus_events = [e for e in self._events if e.event_type == "focus"]
-        focus_freq = len(focus_events) / max(session_duration_ms / 1000, 0.001)
+        focus_freq = self._focus_count / max(session_duration_ms / 1000, 0.001)
 
-        idle_events = [e for e in self._events if e.event_type == "idle"]
-        idle_score = self._compute_idle_pattern(idle_events, session_duration_ms)
+        idle_score = self._compute_idle_pattern(
+            self._idle_durations, session_duration_ms
+        )
 
         return BehavioralMetrics(
             keystroke_timing_variance=keystroke_variance,
@@ -154,7 +220,7 @@ class ProofGenerator:
             scroll_pattern_score=scroll_score,
             focus_switch_frequency=focus_freq,
             idle_pattern_score=idle_score,
-            total_events=len(self._events),
+            total_events=self._event_count,
             session_duration_ms=session_duration_ms,
         )
 
@@ -162,18 +228,7 @@ class ProofGenerator:
         """Generates a 32-byte SHA-256 fingerprint hash from behavioral metrics."""
         metrics = self.compute_metrics()
 
-        data_buffer = struct.pack(
-            ">dddddId",
-            metrics.keystroke_timing_variance,
-            metrics.mouse_movement_entropy,
-            metrics.scroll_pattern_score,
-            metrics.focus_switch_frequency,
-            metrics.idle_pattern_score,
-            metrics.total_events,
-            metrics.session_duration_ms,
-        )
-
-        hash_bytes = hashlib.sha256(data_buffer).digest()
+        hash_bytes = _sha256(self._pack_metrics(metrics)).digest()
         confidence = self._compute_confidence(metrics)
 
         return FingerprintResult(
@@ -182,6 +237,21 @@ class ProofGenerator:
             confidence=confidence,
         )
 
+    @staticmethod
+    def generate_fingerprints_batch(
+        metrics_list: list[BehavioralMetrics],
+    ) -> list[bytes]:
+        """
+        Hashes many metric sets in one call, for bulk-issuance paths that
+        regenerate fingerprints for N users at once. Each digest is
+        identical to what generate_fingerprint produces for the same
+        metrics; hoisting the hash and pack lookups amortizes the
+        per-call dispatch across the batch.
+        """
+        sha256 = _sha256
+        pack = ProofGenerator._pack_metrics
+        return [sha256(pack(m)).digest() for m in metrics_list]
+
     def generate_challenge_nonce(self) -> bytes:
         """Generates a cryptographically secure 32-byte challenge nonce."""
         return os.urandom(32)
@@ -191,103 +261,152 @@ class ProofGenerator:
         Solves a verification challenge using the nonce and fingerprint hash.
         This must produce output identical to the on-chain compute_challenge_hash.
         """
-        result = bytearray(32)
-
-        for i in range(32):
-            result[i] = nonce[i] ^ fingerprint_hash[i]
-            result[i] = (result[i] + nonce[(i + 7) % 32]) & 0xFF
-            result[i] ^= fingerprint_hash[(i + 13) % 32]
+        if _mix_challenge is not None:
+            out = np.empty(32, dtype=np.uint8)
+            _mix_challenge(
+                np.frombuffer(nonce, dtype=np.uint8),
+                np.frombuffer(fingerprint_hash, dtype=np.uint8),
+                out,
+            )
+            return out.tobytes()
+
+        # First pass, all 32 bytes at once (SWAR): the rotated copies
+        # give nonce[(i+7)%32] and fp[(i+13)%32] byte-aligned, XOR is
+        # lane-oblivious, and the masked add is a byte-wise add mod 256.
+        a = (
+            int.from_bytes(nonce, "little")
+            ^ int.from_bytes(fingerprint_hash, "little")
+        )
+        b = int.from_bytes(nonce[7:] + nonce[:7], "little")
+        s = ((a & _LANE_LO) + (b & _LANE_LO)) ^ ((a ^ b) & _LANE_HI)
+        s ^= int.from_bytes(
+            fingerprint_hash[13:] + fingerprint_hash[:13], "little"
+        )
+        result = bytearray(s.to_bytes(32, "little"))
 
+        idx1 = self._IDX1
+        idx31 = self._IDX31
         for round_num in range(4):
             for i in range(32):
-                prev = result[(i + 31) % 32]
-                nxt = result[(i + 1) % 32]
+                prev = result[idx31[i]]
+                nxt = result[idx1[i]]
                 result[i] = (result[i] + ((prev * nxt) & 0xFF) + round_num) & 0xFF
 
         return bytes(result)
 
     def is_ready(self) -> bool:
         """Returns whether enough data has been collected for verification."""
-        session_duration = time.time() * 1000 - self._session_start
         return (
-            len(self._events) >= self.MIN_EVENTS_REQUIRED
-            and session_duration >= self.MIN_SESSION_DURATION_MS
+            self._event_count >= self.MIN_EVENTS_REQUIRED
+            and self._elapsed_ms() >= self.MIN_SESSION_DURATION_MS
         )
 
     @property
     def event_count(self) -> int:
-        return len(self._events)
+        return self._event_count
+
+    @property
+    def event_counts(self) -> dict[str, int]:
+        """
+        Recorded events per type. Counts cover every recorded event —
+        including samples the metric predicates filter out of the
+        buffers — so the values always sum to event_count.
+        """
+        return {
+            "keystroke": len(self._key_holds),
+            "mouse": len(self._mouse_velocities),
+            "scroll": self._scroll_count,
+            "focus": self._focus_count,
+            "idle": len(self._idle_durations),
+        }
 
     def reset(self) -> None:
         """Resets all collected behavioral data."""
-        self._events.clear()
-        self._session_start = time.time() * 1000
+        del self._key_holds[:]
+        del self._key_intervals[:]
+        del self._mouse_velocities[:]
+        del self._scroll_deltas[:]
+        del self._idle_durations[:]
+        self._scroll_count = 0
+        self._focus_count = 0
+        self._event_count = 0
+        self._last_event_ts = 0.0
+        self._last_mouse_x = math.nan
+        self._last_mouse_y = math.nan
+        self._last_mouse_t = math.nan
+        self._session_start_ns = time.monotonic_ns()
+
+    def _elapsed_ms(self) -> float:
+        """Milliseconds since session start on the monotonic clock."""
+        return (time.monotonic_ns() - self._session_start_ns) / 1e6
 
     # -- Private computational methods --
 
     @staticmethod
-    def _compute_variance(values: list[float]) -> float:
-        if len(values) < 2:
-            return 0.0
-        mean = sum(values) / len(values)
-        return sum((v - mean) ** 2 for v in values) / (len(values) - 1)
+    def _pack_metrics(metrics: BehavioralMetrics) -> bytes:
+        """Packs metrics into the fixed 52-byte fingerprint buffer."""
+        return _METRICS_STRUCT.pack(
+            metrics.keystroke_timing_variance,
+            metrics.mouse_movement_entropy,
+            metrics.scroll_pattern_score,
+            metrics.focus_switch_frequency,
+            metrics.idle_pattern_score,
+            metrics.total_events,
+            metrics.session_duration_ms,
+        )
 
     @staticmethod
-    def _compute_entropy(values: list[float]) -> float:
-        if len(values) < 2:
+    def _compute_variance(values: np.ndarray) -> float:
+        values = np.asarray(values, dtype=np.float64)
+        if values.size < 2:
             return 0.0
+        return float(np.var(values, ddof=1))
 
-        bin_count = 20
-        min_val = min(values)
-        max_val = max(values)
-        range_val = max_val - min_val if max_val != min_val else 1.0
-        bins = [0] * bin_count
-
-        for value in values:
-            bin_idx = min(int(((value - min_val) / range_val) * bin_count), bin_count - 1)
-            bins[bin_idx] += 1
-
-        entropy = 0.0
+    @staticmethod
+    def _compute_entropy(values: array) -> float:
         n = len(values)
-        for count in bins:
-            if count > 0:
-                p = count / n
-                entropy -= p * math.log2(p)
+        if n < 2:
+            return 0.0
 
-        return entropy
+        # np.histogram bins over (min, max) with an inclusive upper edge,
+        # matching the hand-rolled 20-bin dispatch this replaces; a
+        # degenerate range collapses to one bin and zero entropy, as
+        # before.
+        counts, _ = np.histogram(
+            np.frombuffer(values, dtype=np.float64), bins=20
+        )
+        p = counts[counts > 0] / n
+        return float(-np.sum(p * np.log2(p)))
 
     @staticmethod
-    def _compute_scroll_pattern(scroll_events: list[BehavioralEvent]) -> float:
-        if len(scroll_events) < 3:
+    def _compute_scroll_pattern(deltas: array) -> float:
+        if len(deltas) < 3:
             return 0.0
 
-        direction_changes = 0
-        prev_direction = 0
-
-        for event in scroll_events:
-            direction = 1 if event.data["delta_y"] > 0 else -1
-            if prev_direction != 0 and direction != prev_direction:
-                direction_changes += 1
-            prev_direction = direction
+        dy = np.frombuffer(deltas, dtype=np.float64)
+        # Direction is +1 for positive deltas, -1 otherwise, matching the
+        # scalar loop this replaces; a change is any adjacent inequality.
+        directions = np.where(dy > 0, 1, -1)
+        direction_changes = int(
+            np.count_nonzero(directions[1:] != directions[:-1])
+        )
 
-        change_ratio = direction_changes / len(scroll_events)
-        intensities = [e.data["intensity"] for e in scroll_events]
-        intensity_variance = ProofGenerator._compute_variance(intensities)
+        change_ratio = direction_changes / len(deltas)
+        intensity_variance = ProofGenerator._compute_variance(np.abs(dy))
 
         return change_ratio * 50 + min(intensity_variance / 100, 50)
 
     @staticmethod
     def _compute_idle_pattern(
-        idle_events: list[BehavioralEvent], session_duration_ms: float
+        durations: array, session_duration_ms: float
     ) -> float:
-        if not idle_events:
+        if not durations:
             return 100.0
 
-        total_idle = sum(e.data["duration"] for e in idle_events)
-        idle_ratio = total_idle / max(session_duration_ms, 1.0)
+        arr = np.frombuffer(durations, dtype=np.float64)
+        idle_ratio = float(arr.sum()) / max(session_duration_ms, 1.0)
 
-        durations = [e.data["duration"] for e in idle_events]
-        duration_variance = ProofGenerator._compute_variance(durations)
+        duration_variance = ProofGenerator._compute_variance(arr)
 
         base_score = (1 - idle_ratio) * 70
         variance_bonus = min(duration_variance / 10000, 30)
@@ -321,8 +440,3 @@ class ProofGenerator:
 
         return min(score, 100.0)
 
-    def _get_last_event_of_type(self, event_type: str) -> Optional[BehavioralEvent]:
-        for event in reversed(self._events):
-            if event.event_type == event_type:
-                return event
-        return None
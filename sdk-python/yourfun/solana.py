@@ -4,9 +4,12 @@ Handles instruction creation, PDA derivation, and transaction serialization.
 """
 
 from __future__ import annotations
+import asyncio
 import hashlib
 import struct
-from typing import Optional
+import time
+from functools import lru_cache
+from typing import Iterable, Optional
 
 from solders.pubkey import Pubkey
 from solders.system_program import ID as SYSTEM_PROGRAM_ID
@@ -24,6 +27,45 @@ SEED_HUMAN = b"human"
 SEED_SESSION = b"session"
 SEED_INTERACTION = b"interaction"
 
+# Precompiled account-field layouts; parsing the format strings once
+# at import keeps it off the per-call pack/unpack cost.
+_U64_LE = struct.Struct("<Q")
+_U32_LE = struct.Struct("<I")
+
+# Whole-account layouts, with pad bytes standing in for the fields the
+# readers do not need. HumanRecord: discriminator, wallet, verified_by,
+# verified_at, verification_level, fingerprint_hash, is_active,
+# session_count, total_interactions, last_active_at, learning_score.
+_HUMAN_RECORD_STRUCT = struct.Struct("<8x32x32xqB32xBQQ8xQ")
+# PlatformRegistry: discriminator, authority, verification_fee,
+# total_verified, total_sessions, total_interactions, is_paused.
+_REGISTRY_STATS_STRUCT = struct.Struct("<8x32x8xQQQB")
+
+# The program's instruction set is closed, so the Anchor discriminators
+# are computed once at import instead of hashing on every tx build.
+_DISCRIMINATORS = {
+    name: hashlib.sha256(f"global:{name}".encode("utf-8")).digest()[:8]
+    for name in ("register_human", "create_session", "record_interaction")
+}
+
+
+# Process-wide clients keyed by (rpc_url, program_id); see
+# SolanaClient.shared. Short-lived callers reuse the provider's warm
+# TCP/TLS connections instead of handshaking per instance.
+_shared_clients: dict[tuple[str, Optional[Pubkey]], "SolanaClient"] = {}
+
+
+@lru_cache(maxsize=4096)
+def _find_pda(
+    seeds: tuple[bytes, ...], program_id: Pubkey
+) -> tuple[Pubkey, int]:
+    """
+    Memoized find_program_address: the bump search runs up to 255
+    SHA-256 probes per derivation, and the result is fully determined
+    by (seeds, program_id), so hot wallets pay it once.
+    """
+    return Pubkey.find_program_address(list(seeds), program_id)
+
 
 class SolanaClient:
     """
@@ -34,6 +76,10 @@ class SolanaClient:
         status = await client.get_verification_status(wallet_str)
     """
 
+    # A blockhash stays valid for ~150 slots (~60s); reusing it for 20s
+    # keeps a wide safety margin while skipping one RPC per tx build.
+    _BLOCKHASH_TTL_S = 20.0
+
     def __init__(
         self,
         rpc_url: str = "https://api.devnet.solana.com",
@@ -41,34 +87,58 @@ class SolanaClient:
     ) -> None:
         self._rpc = AsyncClient(rpc_url)
         self._program_id = program_id or PROGRAM_ID
+        self._blockhash: Optional[Blockhash] = None
+        self._blockhash_at: float = 0.0
+        self._blockhash_lock = asyncio.Lock()
+
+    @classmethod
+    def shared(
+        cls,
+        rpc_url: str = "https://api.devnet.solana.com",
+        program_id: Optional[Pubkey] = None,
+    ) -> SolanaClient:
+        """
+        Returns the process-wide client for the given RPC URL, creating
+        it lazily. Callers must not close the returned client; it is
+        shared, and its warm connections (and blockhash cache) serve
+        every short-lived caller in the process.
+        """
+        key = (rpc_url, program_id)
+        client = _shared_clients.get(key)
+        if client is None:
+            client = cls(rpc_url, program_id)
+            _shared_clients[key] = client
+        return client
 
     # -- PDA Derivation --
 
     def derive_registry_address(self) -> tuple[Pubkey, int]:
-        return Pubkey.find_program_address([SEED_REGISTRY], self._program_id)
+        return _find_pda((SEED_REGISTRY,), self._program_id)
 
     def derive_human_record_address(self, wallet: Pubkey) -> tuple[Pubkey, int]:
-        return Pubkey.find_program_address(
-            [SEED_HUMAN, bytes(wallet)], self._program_id
-        )
+        return _find_pda((SEED_HUMAN, bytes(wallet)), self._program_id)
 
     def derive_session_address(
         self, human_record: Pubkey, session_index: int
     ) -> tuple[Pubkey, int]:
-        index_bytes = struct.pack("<Q", session_index)
-        return Pubkey.find_program_address(
-            [SEED_SESSION, bytes(human_record), index_bytes], self._program_id
+        index_bytes = _U64_LE.pack(session_index)
+        return _find_pda(
+            (SEED_SESSION, bytes(human_record), index_bytes), self._program_id
         )
 
-
     def derive_interaction_address(
         self, session: Pubkey, interaction_index: int
     ) -> tuple[Pubkey, int]:
-        index_bytes = struct.pack("<I", interaction_index)
-        return Pubkey.find_program_address(
-            [SEED_INTERACTION, bytes(session), index_bytes], self._program_id
+        index_bytes = _U32_LE.pack(interaction_index)
+        return _find_pda(
+            (SEED_INTERACTION, bytes(session), index_bytes), self._program_id
         )
 
+    def prewarm_wallets(self, wallets: Iterable[Pubkey]) -> None:
+        """Fills the PDA cache for a set of wallets ahead of a burst."""
+        for wallet in wallets:
+            self.derive_human_record_address(wallet)
+
     # -- Transaction Builders --
 
     async def build_register_human_tx(
@@ -81,15 +151,21 @@ class SolanaClient:
         registry_addr, _ = self.derive_registry_address()
         human_record_addr, _ = self.derive_human_record_address(wallet)
 
-        registry_info = await self._rpc.get_account_info(registry_addr)
+        # The account read and the blockhash fetch are independent; run
+        # them concurrently so the build pays one round trip, not two.
+        registry_info, recent_blockhash = await asyncio.gather(
+            self._rpc.get_account_info(registry_addr),
+            self._get_blockhash(),
+        )
         if not registry_info.value:
             raise ValueError("Platform registry not initialized")
 
-        authority_bytes = registry_info.value.data[8:40]
-        authority = Pubkey.from_bytes(authority_bytes)
+        # One unavoidable 32-byte copy: solders' Pubkey.from_bytes needs
+        # an owned bytes object, so a zero-copy memoryview slice cannot
+        # cross the FFI boundary here.
+        authority = Pubkey.from_bytes(registry_info.value.data[8:40])
 
-        discriminator = self._compute_discriminator("register_human")
-        data = discriminator + challenge_nonce + fingerprint_hash
+        data = _DISCRIMINATORS["register_human"] + challenge_nonce + fingerprint_hash
 
         ix = Instruction(
             program_id=self._program_id,
@@ -103,9 +179,6 @@ class SolanaClient:
             data=data,
         )
 
-        blockhash_resp = await self._rpc.get_latest_blockhash()
-        recent_blockhash = blockhash_resp.value.blockhash
-
         msg = Message.new_with_blockhash([ix], wallet, recent_blockhash)
         return Transaction.new_unsigned(msg)
 
@@ -119,17 +192,19 @@ class SolanaClient:
         registry_addr, _ = self.derive_registry_address()
         human_record_addr, _ = self.derive_human_record_address(wallet)
 
-        human_info = await self._rpc.get_account_info(human_record_addr)
+        human_info, recent_blockhash = await asyncio.gather(
+            self._rpc.get_account_info(human_record_addr),
+            self._get_blockhash(),
+        )
         if not human_info.value:
             raise ValueError("Human record not found for this wallet")
 
         offset = 8 + 32 + 32 + 8 + 1 + 32 + 1
-        session_count = struct.unpack_from("<Q", human_info.value.data, offset)[0]
+        session_count = _U64_LE.unpack_from(human_info.value.data, offset)[0]
 
         session_addr, _ = self.derive_session_address(human_record_addr, session_count)
 
-        discriminator = self._compute_discriminator("create_session")
-        data = discriminator + bytes([personality_id]) + initial_topic
+        data = _DISCRIMINATORS["create_session"] + bytes([personality_id]) + initial_topic
 
         ix = Instruction(
             program_id=self._program_id,
@@ -143,9 +218,6 @@ class SolanaClient:
             data=data,
         )
 
-        blockhash_resp = await self._rpc.get_latest_blockhash()
-        recent_blockhash = blockhash_resp.value.blockhash
-
         msg = Message.new_with_blockhash([ix], wallet, recent_blockhash)
         return Transaction.new_unsigned(msg), session_addr
 
@@ -163,26 +235,28 @@ class SolanaClient:
         registry_addr, _ = self.derive_registry_address()
         human_record_addr, _ = self.derive_human_record_address(wallet)
 
-        session_info = await self._rpc.get_account_info(session_addr)
+        session_info, recent_blockhash = await asyncio.gather(
+            self._rpc.get_account_info(session_addr),
+            self._get_blockhash(),
+        )
         if not session_info.value:
             raise ValueError("Session account not found")
 
         interaction_count_offset = 8 + 32 + 32 + 8 + 8 + 8 + 8 + 1
-        interaction_count = struct.unpack_from(
-            "<I", session_info.value.data, interaction_count_offset
+        interaction_count = _U32_LE.unpack_from(
+            session_info.value.data, interaction_count_offset
         )[0]
 
         interaction_addr, _ = self.derive_interaction_address(
             session_addr, interaction_count
         )
 
-        discriminator = self._compute_discriminator("record_interaction")
         data = (
-            discriminator
+            _DISCRIMINATORS["record_interaction"]
             + content_hash
             + bytes([interaction_type])
             + bytes([score])
-            + struct.pack("<I", duration_seconds)
+            + _U32_LE.pack(duration_seconds)
         )
 
         ix = Instruction(
@@ -198,9 +272,6 @@ class SolanaClient:
             data=data,
         )
 
-        blockhash_resp = await self._rpc.get_latest_blockhash()
-        recent_blockhash = blockhash_resp.value.blockhash
-
         msg = Message.new_with_blockhash([ix], wallet, recent_blockhash)
         return Transaction.new_unsigned(msg)
 
@@ -223,25 +294,15 @@ class SolanaClient:
                 "learning_score": 0,
             }
 
-        data = info.value.data
-        offset = 8 + 32 + 32
-
-        verified_at = struct.unpack_from("<q", data, offset)[0]
-        offset += 8
-
-        verification_level = data[offset]
-        offset += 1 + 32
-
-        is_active = data[offset] == 1
-        offset += 1
-
-        session_count = struct.unpack_from("<Q", data, offset)[0]
-        offset += 8
-
-        total_interactions = struct.unpack_from("<Q", data, offset)[0]
-        offset += 8 + 8
-
-        learning_score = struct.unpack_from("<Q", data, offset)[0]
+        (
+            verified_at,
+            verification_level,
+            is_active_raw,
+            session_count,
+            total_interactions,
+            learning_score,
+        ) = _HUMAN_RECORD_STRUCT.unpack_from(info.value.data)
+        is_active = is_active_raw == 1
 
         return {
             "is_registered": True,
@@ -261,16 +322,13 @@ class SolanaClient:
         if not info.value:
             raise ValueError("Platform registry not found")
 
-        data = info.value.data
-        offset = 8 + 32 + 8
-
-        total_verified = struct.unpack_from("<Q", data, offset)[0]
-        offset += 8
-        total_sessions = struct.unpack_from("<Q", data, offset)[0]
-        offset += 8
-        total_interactions = struct.unpack_from("<Q", data, offset)[0]
-        offset += 8
-        is_paused = data[offset] == 1
+        (
+            total_verified,
+            total_sessions,
+            total_interactions,
+            is_paused_raw,
+        ) = _REGISTRY_STATS_STRUCT.unpack_from(info.value.data)
+        is_paused = is_paused_raw == 1
 
         return {
             "total_verified_humans": total_verified,
@@ -279,6 +337,29 @@ class SolanaClient:
             "is_paused": is_paused,
         }
 
+    async def _get_blockhash(self) -> Blockhash:
+        """Returns a recent blockhash, reusing the cached one within TTL."""
+        if (
+            self._blockhash is not None
+            and time.monotonic() - self._blockhash_at < self._BLOCKHASH_TTL_S
+        ):
+            return self._blockhash
+        async with self._blockhash_lock:
+            # Re-check under the lock so a burst of builds triggers a
+            # single fetch rather than a thundering herd.
+            if (
+                self._blockhash is None
+                or time.monotonic() - self._blockhash_at >= self._BLOCKHASH_TTL_S
+            ):
+                resp = await self._rpc.get_latest_blockhash()
+                self._blockhash = resp.value.blockhash
+                self._blockhash_at = time.monotonic()
+            return self._blockhash
+
+    def invalidate_blockhash(self) -> None:
+        """Drops the cached blockhash, e.g. before retrying an expired tx."""
+        self._blockhash = None
+
     async def close(self) -> None:
         """Closes the RPC client."""
         await self._rpc.close()
@@ -286,6 +367,9 @@ class SolanaClient:
     # -- Private helpers --
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def _compute_discriminator(name: str) -> bytes:
+        """Discriminator for dynamically discovered instruction names;
+        the program's own instructions use _DISCRIMINATORS directly."""
         full = f"global:{name}"
         return hashlib.sha256(full.encode("utf-8")).digest()[:8]
@@ -4,10 +4,12 @@ Mirrors on-chain account structures and API request/response schemas.
 """
 
 from __future__ import annotations
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from enum import IntEnum
 from typing import Optional
 
+import msgspec
+
 
 class InteractionType(IntEnum):
     """On-chain interaction type identifiers."""
@@ -89,23 +91,27 @@ class InteractionLog:
     bump: int
 
 
-@dataclass
-class ChatMessage:
+# API request/response types are msgspec Structs rather than dataclasses:
+# instances carry no __dict__, and msgspec can decode JSON straight into
+# them (rename="camel" maps the API's camelCase keys onto snake_case
+# fields) without an intermediate dict pass.
+
+
+class ChatMessage(msgspec.Struct, rename="camel"):
     """A single message in a conversation."""
     role: str
     content: str
     timestamp: int
 
 
-@dataclass
-class ChatResponse:
+class ChatResponse(msgspec.Struct, rename="camel"):
     """Response from the AI companion."""
     reply: str
     content_hash: str
     interaction_type: InteractionType
     suggested_score: int
-    learning_insights: list[str] = field(default_factory=list)
-    next_topic_suggestions: list[str] = field(default_factory=list)
+    learning_insights: list[str] = msgspec.field(default_factory=list)
+    next_topic_suggestions: list[str] = msgspec.field(default_factory=list)
 
 
 @dataclass
@@ -115,8 +121,7 @@ class ChallengeRequest:
     challenge_type: str
 
 
-@dataclass
-class ChallengeResponse:
+class ChallengeResponse(msgspec.Struct, rename="camel"):
     """Generated challenge from the verification server."""
     challenge_id: str
     challenge_data: str
@@ -124,8 +129,7 @@ class ChallengeResponse:
     difficulty: int
 
 
-@dataclass
-class LearningProgress:
+class LearningProgress(msgspec.Struct, rename="camel"):
     """Progress tracker for a learning topic."""
     topic_id: str
     topic_name: str
@@ -137,13 +141,27 @@ class LearningProgress:
     progress_percent: int = 0
 
 
-@dataclass
-class VerificationStatus:
+class VerificationStatus(msgspec.Struct, rename="camel"):
     """On-chain verification status for a wallet."""
     is_registered: bool
     is_verified: bool
     verification_level: int
-    verified_at: Optional[int]
     session_count: int
     total_interactions: int
     learning_score: int
+    verified_at: Optional[int] = None
+
+
+class SessionEnvelope(msgspec.Struct, rename="camel"):
+    """Envelope for session-creation responses."""
+    session_id: str
+
+
+class ProgressEnvelope(msgspec.Struct, rename="camel"):
+    """Envelope for learning-progress responses."""
+    progress: list[LearningProgress]
+
+
+class TopicsEnvelope(msgspec.Struct, rename="camel"):
+    """Envelope for topic-list responses."""
+    topics: list[dict]